@@ -1,64 +1,297 @@
 import copy
 import json
+import mmap
+import os
 import random
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
 from pycocoedit.objectdetection.filter import BaseFilter, Filters, TargetType
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def load_json(file_path: str) -> dict[str, Any]:
+    if orjson is not None:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return json.load(f)
+            # parse from the page cache instead of reading the whole file into a buffer
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as buf:
+                    try:
+                        return orjson.loads(buf)
+                    except orjson.JSONDecodeError:
+                        # json.dump writes NaN and Infinity, which orjson rejects
+                        return json.loads(bytes(buf))
+    with open(file_path) as f:
+        return json.load(f)
+
+
+def dump_json(data: dict[str, Any], file_path: str) -> None:
+    # serialize first and write the whole document at once
+    if orjson is not None:
+        try:
+            # accept non-str keys like json.dumps does
+            data_bytes = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # e.g. integers above 64 bits, which json.dumps writes as they are
+            data_bytes = None
+        # orjson writes NaN and Infinity as null, while json.dumps keeps them.
+        # data without null in its output cannot contain them.
+        if data_bytes is not None and b"null" not in data_bytes:
+            with open(file_path, "wb") as f:
+                f.write(data_bytes)
+            return
+    data_str = json.dumps(data)
+    with open(file_path, "w") as f:
+        f.write(data_str)
+
 
 def validate_keys(data: list[dict], required_keys: list[str], target: str) -> None:
+    required = frozenset(required_keys)
     for d in data:
-        missing_keys = [key for key in required_keys if key not in d]
-        if missing_keys:
+        if not required.issubset(d):
+            missing_keys = [key for key in required_keys if key not in d]
             raise KeyError(
                 f"Missing keys {missing_keys} in {target} with ID: {d.get('id', 'Unknown')}"
             )
 
 
+# keys each record of the target type must have
+REQUIRED_KEYS: dict[TargetType, list[str]] = {
+    TargetType.IMAGE: ["id", "file_name", "width", "height"],
+    TargetType.CATEGORY: ["id", "name", "supercategory"],
+    TargetType.ANNOTATION: [
+        "id",
+        "image_id",
+        "category_id",
+        "bbox",
+        "area",
+        "segmentation",
+    ],
+}
+
+
 def validate_images(images: list[dict]) -> None:
-    required_keys = ["id", "file_name", "width", "height"]
-    validate_keys(images, required_keys, "image")
+    validate_keys(images, REQUIRED_KEYS[TargetType.IMAGE], "image")
 
 
 def validate_categories(categories: list[dict]) -> None:
-    required_keys = ["id", "name", "supercategory"]
-    validate_keys(categories, required_keys, "category")
+    validate_keys(categories, REQUIRED_KEYS[TargetType.CATEGORY], "category")
 
 
 def validate_annotations(annotations: list[dict]) -> None:
-    required_keys = ["id", "image_id", "category_id", "bbox", "area", "segmentation"]
-    validate_keys(annotations, required_keys, "annotation")
+    validate_keys(annotations, REQUIRED_KEYS[TargetType.ANNOTATION], "annotation")
+
+
+def build_predicate(filters: Filters) -> Callable[[dict], bool]:
+    """
+    Build a function that returns whether the data is kept by the filters.
+
+    The data is kept if any include filter matches (or there is no include filter)
+    and no exclude filter matches.
+    """
+    include_applies = [f.apply for f in filters.include_filters]
+    exclude_applies = [f.apply for f in filters.exclude_filters]
+
+    def keep(d: dict) -> bool:
+        if include_applies and not any(fn(d) for fn in include_applies):
+            return False
+        if exclude_applies and any(fn(d) for fn in exclude_applies):
+            return False
+        return True
+
+    return keep
+
+
+# attribute of CocoData holding the data each target type filters
+TARGET_ATTRS: dict[TargetType, str] = {
+    TargetType.IMAGE: "images",
+    TargetType.CATEGORY: "categories",
+    TargetType.ANNOTATION: "annotations",
+    TargetType.LICENSE: "licenses",
+}
 
 
 class CocoData:
     """
     Coco format data.
-    """
 
-    def __init__(self, annotation: str | dict[str, Any]):
+    Parameters
+    ----------
+    annotation : str | dict
+        path to the annotation file or the annotation dict in COCO format.
+    deep : bool
+        whether to deep copy the annotation dict.
+        if False, only the top-level lists are copied and the records are shared with the given dict.
+        default is False.
+    validate : bool
+        whether to check that images, categories and annotations have the required keys.
+        set to False only if the data is known to be valid.
+        default is True.
+    """
 
-        if isinstance(annotation, dict):
+    __slots__ = (
+        "images",
+        "annotations",
+        "categories",
+        "licenses",
+        "info",
+        "filter_applied",
+        "_filters",
+    )
+
+    def __init__(
+        self,
+        annotation: str | dict[str, Any],
+        deep: bool = False,
+        validate: bool = True,
+    ):
+
+        dataset: dict[str, Any]
+        if isinstance(annotation, dict) and deep:
             dataset = copy.deepcopy(annotation)
+        elif isinstance(annotation, dict):
+            # copy the lists that filters rebind, other values are kept as they are
+            dataset = dict(annotation)
+            for key in ("images", "annotations", "categories"):
+                dataset[key] = list(annotation[key])
+            if isinstance(dataset.get("licenses"), list):
+                dataset["licenses"] = list(dataset["licenses"])
         else:
-            with open(annotation) as f:
-                dataset = json.load(f)
+            dataset = load_json(annotation)
         self.images: list[dict] = dataset["images"]
         self.annotations: list[dict] = dataset["annotations"]
         self.categories: list[dict] = dataset["categories"]
         self.licenses: list[dict] = dataset.get("licenses", [])
         self.info: dict = dataset.get("info", {})
 
-        validate_images(self.images)
-        validate_categories(self.categories)
-        validate_annotations(self.annotations)
+        if validate:
+            validate_images(self.images)
+            validate_categories(self.categories)
+            validate_annotations(self.annotations)
 
-        self.image_filters: Filters = Filters()
-        self.category_filters: Filters = Filters()
-        self.annotation_filters: Filters = Filters()
-        self.licenses_filters: Filters = Filters()
+        self._filters: dict[TargetType, Filters] = {
+            target_type: Filters() for target_type in TARGET_ATTRS
+        }
 
         self.filter_applied = False
 
+    @classmethod
+    def from_file_streaming(
+        cls, file_path: str, filters: list[BaseFilter] | None = None
+    ) -> "CocoData":
+        """
+        Load an annotation file while applying filters to each record as it is parsed.
+
+        Only the records kept by the filters are held in memory, which helps with huge annotation files.
+        The file is parsed once, but records are built from parser events in Python,
+        so loading takes longer than `CocoData(file_path)`. It trades speed for peak memory.
+        The returned data is marked as filtered and keeps the given filters.
+        Requires `ijson`, which only reads strict JSON, so files with NaN or Infinity are not supported.
+
+        Parameters
+        ----------
+        file_path : str
+            path to the annotation file.
+        filters : list[BaseFilter] | None
+            filters to be applied while loading.
+        """
+        if ijson is None:
+            raise ImportError(
+                "ijson is required for streaming. Install it with `pip install ijson`."
+            )
+
+        all_filters: dict[TargetType, Filters] = {
+            target_type: Filters() for target_type in TARGET_ATTRS
+        }
+        for filter in filters or []:
+            if filter.target_type not in all_filters:
+                raise ValueError(f"Unsupported target_type: {filter.target_type}")
+            all_filters[filter.target_type].add(filter)
+
+        keeps: dict[str, Callable[[dict], bool]] = {}
+        # required keys as a set, built once per target and checked on each record
+        required: dict[str, tuple[TargetType, frozenset[str]]] = {}
+        for target_type, attr in TARGET_ATTRS.items():
+            keeps[f"{attr}.item"] = build_predicate(all_filters[target_type])
+            if target_type in REQUIRED_KEYS:
+                required_keys = frozenset(REQUIRED_KEYS[target_type])
+                required[f"{attr}.item"] = (target_type, required_keys)
+        kept: dict[str, list[dict]] = {prefix: [] for prefix in keeps}
+        kept_attrs = set(TARGET_ATTRS.values())
+        top_level_keys = kept_attrs | {"info"}
+
+        dataset: dict[str, Any] = {}
+        builder = None
+        builder_prefix = ""
+        with open(file_path, "rb") as f:
+            # a single pass over the parser events, building one record at a time
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is not None:
+                    builder.event(event, value)
+                    end = event in ("end_map", "end_array")
+                    if not end or prefix != builder_prefix:
+                        continue
+                    value = builder.value
+                    builder = None
+                elif prefix in kept_attrs and event in ("start_array", "end_array"):
+                    # its records are filtered one by one under "<attr>.item"
+                    dataset[prefix] = kept[f"{prefix}.item"]
+                    continue
+                elif prefix not in keeps and prefix not in top_level_keys:
+                    continue
+                elif event in ("start_map", "start_array"):
+                    builder = ijson.ObjectBuilder()
+                    builder.event(event, value)
+                    builder_prefix = prefix
+                    continue
+
+                if prefix in keeps:
+                    if prefix in required:
+                        target_type, required_keys = required[prefix]
+                        if not required_keys.issubset(value):
+                            validate_keys(
+                                [value], REQUIRED_KEYS[target_type], target_type.value
+                            )
+                    if keeps[prefix](value):
+                        kept[prefix].append(value)
+                else:
+                    # info, or a value that is not a list, is kept as in CocoData(file_path)
+                    dataset[prefix] = value
+
+        # records were validated while streaming.
+        # missing images, categories or annotations raise KeyError as in CocoData(file_path)
+        coco_data = cls(dataset, validate=False)
+        coco_data._filters = all_filters
+        coco_data.filter_applied = True
+        return coco_data
+
+    @property
+    def image_filters(self) -> Filters:
+        return self._filters[TargetType.IMAGE]
+
+    @property
+    def category_filters(self) -> Filters:
+        return self._filters[TargetType.CATEGORY]
+
+    @property
+    def annotation_filters(self) -> Filters:
+        return self._filters[TargetType.ANNOTATION]
+
+    @property
+    def licenses_filters(self) -> Filters:
+        return self._filters[TargetType.LICENSE]
+
     def add_filter(self, filter: BaseFilter) -> "CocoData":
         """
         Add a filter.
@@ -69,63 +302,43 @@ class CocoData:
             filter to be added.
         """
 
-        if filter.target_type == TargetType.IMAGE:
-            self.image_filters.add(filter)
-        if filter.target_type == TargetType.CATEGORY:
-            self.category_filters.add(filter)
-        if filter.target_type == TargetType.ANNOTATION:
-            self.annotation_filters.add(filter)
-        if filter.target_type == TargetType.LICENSE:
-            self.licenses_filters.add(filter)
+        if filter.target_type not in self._filters:
+            raise ValueError(f"Unsupported target_type: {filter.target_type}")
+        self._filters[filter.target_type].add(filter)
         return self
 
-    def apply_filter(self) -> "CocoData":
+    def apply_filter(self, max_workers: int = 1) -> "CocoData":
         """
         Apply filters to the dataset.
+
+        Parameters
+        ----------
+        max_workers : int
+            number of threads used to filter images, categories, annotations and licenses concurrently.
+            only helps when the filters release the GIL, so the filters must be thread-safe.
+            default is 1 (no threads).
         """
-        targets: list[list[dict]] = [
-            self.images,
-            self.categories,
-            self.annotations,
-            self.licenses,
-        ]
-        all_filters: list[Filters] = [
-            self.image_filters,
-            self.category_filters,
-            self.annotation_filters,
-            self.licenses_filters,
+        targets: list[tuple[str, Callable[[dict], bool]]] = [
+            (TARGET_ATTRS[target_type], build_predicate(filters))
+            for target_type, filters in self._filters.items()
+            if filters.include_filters or filters.exclude_filters
         ]
 
-        def update(index: int, new_data: list[dict]):
-            if index == 0:
-                self.images = new_data
-            if index == 1:
-                self.categories = new_data
-            if index == 2:
-                self.annotations = new_data
-            if index == 3:
-                self.licenses = new_data
-
-        for i in range(len(targets)):
-            filters: Filters = all_filters[i]
-            include_filters: list[BaseFilter] = filters.include_filters
-            exclude_filters: list[BaseFilter] = filters.exclude_filters
-            if len(include_filters) != 0:
-                new_dicts = []
-                for d in targets[i]:
-                    for include_filter in include_filters:
-                        if include_filter.apply(d):
-                            new_dicts.append(d)
-                            break
-                update(i, new_dicts)
-            if len(exclude_filters) != 0:
-                new_dicts = []
-                for d in targets[i]:
-                    for exclude_filter in exclude_filters:
-                        if not exclude_filter.apply(d):
-                            new_dicts.append(d)
-                            break
-                update(i, new_dicts)
+        def run(attr: str, keep: Callable[[dict], bool]) -> list[dict]:
+            data: list[dict] = getattr(self, attr)
+            return [d for d in data if keep(d)]
+
+        if max_workers > 1 and len(targets) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(targets))
+            ) as executor:
+                futures = [executor.submit(run, attr, keep) for attr, keep in targets]
+                results = [future.result() for future in futures]
+        else:
+            results = [run(attr, keep) for attr, keep in targets]
+
+        for (attr, _), new_data in zip(targets, results):
+            setattr(self, attr, new_data)
 
         self.filter_applied = True
         return self
@@ -148,43 +361,24 @@ class CocoData:
         if not self.filter_applied:
             self.apply_filter()
 
-        # Remove annotations with category_id not in categories
-        cat_ids = [cat["id"] for cat in self.categories]
-        _annotations = []
-        for i in range(len(self.annotations)):
-            ann = self.annotations[i]
-            _cat_id = ann["category_id"]
-            if ann["category_id"] in cat_ids:
-                _annotations.append(ann)
-        self.annotations = _annotations
-
-        # Remove annotations with no images
-        img_ids = [img["id"] for img in self.images]
-        _annotations = []
-        for i in range(len(self.annotations)):
-            ann = self.annotations[i]
-            _img_id = ann["image_id"]
-            if ann["image_id"] in img_ids:
-                _annotations.append(ann)
-        self.annotations = _annotations
+        # Remove annotations with category_id not in categories or with no images
+        cat_ids = {cat["id"] for cat in self.categories}
+        img_ids = {img["id"] for img in self.images}
+        self.annotations = [
+            ann
+            for ann in self.annotations
+            if ann["category_id"] in cat_ids and ann["image_id"] in img_ids
+        ]
 
         if correct_image:
             # Remove images with no annotations
-            img_ids = [ann["image_id"] for ann in self.annotations]
-            _images = []
-            for img in self.images:
-                if img["id"] in img_ids:
-                    _images.append(img)
-            self.images = _images
+            img_ids = {ann["image_id"] for ann in self.annotations}
+            self.images = [img for img in self.images if img["id"] in img_ids]
 
         if correct_category:
             # Remove categories with no annotations
-            cat_ids = [ann["category_id"] for ann in self.annotations]
-            _categories = []
-            for cat in self.categories:
-                if cat["id"] in cat_ids:
-                    _categories.append(cat)
-            self.categories = _categories
+            cat_ids = {ann["category_id"] for ann in self.annotations}
+            self.categories = [cat for cat in self.categories if cat["id"] in cat_ids]
 
         return self
 
@@ -213,8 +407,7 @@ class CocoData:
         """
         self.correct(correct_image=correct_image, correct_category=correct_category)
         dataset = self.get_dataset()
-        with open(file_path, "w") as f:
-            json.dump(dataset, f)
+        dump_json(dataset, file_path)
 
     def sample(
         self, n: int, correct_image: bool = True, correct_category: bool = False
@@ -106,13 +106,13 @@ class ImageFileNameFilter(BaseFilter):
         - The type of the filter.FilterType.INCLUSION or FilterType.EXCLUSION.
         - if FilterType.INCLUSION, the images with the file names in the `file_names` are included.
         - if FilterType.EXCLUSION, the images with the file names in the `file_names` are excluded.
-    file_names : list[str]
-        The list of image file names to filter.
+    file_names : frozenset[str]
+        The image file names to filter.
     """
 
     def __init__(self, filter_type: FilterType, file_names: list[str]):
         super().__init__(filter_type, TargetType.IMAGE)
-        self.file_names = file_names
+        self.file_names: frozenset[str] = frozenset(file_names)
 
     def apply(self, data: dict) -> bool:
         return data["file_name"] in self.file_names
@@ -128,11 +128,13 @@ class CategoryNameFilter(BaseFilter):
         - The type of the filter.FilterType.INCLUSION or FilterType.EXCLUSION.
         - if FilterType.INCLUSION, the categories with the names in the `category_names` are included.
         - if FilterType.EXCLUSION, the categories with the names in the `category_names` are excluded.
+    category_names : frozenset[str]
+        The category names to filter.
     """
 
     def __init__(self, filter_type: FilterType, category_names: list[str]):
         super().__init__(filter_type, TargetType.CATEGORY)
-        self.category_names = category_names
+        self.category_names: frozenset[str] = frozenset(category_names)
 
     def apply(self, data: dict) -> bool:
         return data["name"] in self.category_names
@@ -1,6 +1,17 @@
+import gc
+import json
+import math
+import weakref
+
 import pytest
 
-from pycocoedit.objectdetection.data import CocoData, validate_keys
+from pycocoedit.objectdetection import data as data_module
+from pycocoedit.objectdetection.data import (
+    CocoData,
+    dump_json,
+    load_json,
+    validate_keys,
+)
 from pycocoedit.objectdetection.filter import (
     BaseFilter,
     CategoryNameFilter,
@@ -327,6 +338,18 @@ def test_correct__remove_category_with_no_annotation():
     # then
     assert coco_data.get_dataset() == dataset
 
+    # when
+    coco_data = CocoData(dataset)
+    coco_data.correct(correct_image=False, correct_category=True)
+
+    # then
+    assert coco_data.get_dataset().get("images") == dataset["images"]
+    assert coco_data.get_dataset().get("annotations") == dataset["annotations"]
+    assert coco_data.get_dataset().get("categories") == [
+        dataset["categories"][0],
+        dataset["categories"][1],
+    ]
+
 
 info = {
     "description": "COCO 2020 Dataset",
@@ -538,11 +561,403 @@ def test_add_custom_filter():
     assert coco_data.categories == categories
 
 
+def test_multiple_exclude_filters():
+    # given
+    coco_data = CocoData(dataset)
+    coco_data.add_filter(ImageFileNameFilter(FilterType.EXCLUSION, ["image0.jpg"]))
+    coco_data.add_filter(ImageFileNameFilter(FilterType.EXCLUSION, ["image1.jpg"]))
+
+    # when
+    coco_data.apply_filter()
+
+    # then
+    assert coco_data.images == [images[2]]
+
+    # when
+    coco_data.correct()
+
+    # then
+    assert coco_data.annotations == [annotations[2]]
+    assert coco_data.images == [images[2]]
+    assert coco_data.categories == categories
+
+
+def test_include_and_multiple_exclude_filters():
+    # given
+    class AreaExclusionFilter(BaseFilter):
+        def __init__(self, area: int):
+            super().__init__(FilterType.EXCLUSION, TargetType.ANNOTATION)
+            self.area = area
+
+        def apply(self, data: dict) -> bool:
+            return data["area"] == self.area
+
+    class AreaInclusionFilter(BaseFilter):
+        def __init__(self):
+            super().__init__(FilterType.INCLUSION, TargetType.ANNOTATION)
+
+        def apply(self, data: dict) -> bool:
+            return data["area"] >= 100
+
+    coco_data = CocoData(dataset)
+    coco_data.add_filter(AreaInclusionFilter())
+    coco_data.add_filter(AreaExclusionFilter(100))
+    coco_data.add_filter(AreaExclusionFilter(300))
+
+    # when
+    coco_data.apply_filter()
+
+    # then
+    assert coco_data.annotations == [annotations[1]]
+
+
+def test_apply_filter__threads():
+    # given
+    coco_data = CocoData(dataset)
+    coco_data.add_filter(ImageFileNameFilter(FilterType.EXCLUSION, ["image0.jpg"]))
+    coco_data.add_filter(CategoryNameFilter(FilterType.EXCLUSION, ["category2"]))
+
+    # when
+    coco_data.apply_filter(max_workers=4)
+
+    # then
+    assert coco_data.images == [images[1], images[2]]
+    assert coco_data.categories == [categories[0], categories[1]]
+    assert coco_data.annotations == annotations
+    assert coco_data.licenses == licenses
+
+
+def test_correct__repeated():
+    # given
+    coco_data = CocoData(dataset)
+    coco_data.add_filter(CategoryNameFilter(FilterType.INCLUSION, ["category1"]))
+
+    # when
+    coco_data.correct()
+    coco_data.correct()
+
+    # then
+    assert coco_data.annotations == [annotations[1]]
+    assert coco_data.images == [images[1]]
+
+
+def test_correct__repeated_after_rebinding():
+    # given
+    coco_data = CocoData(dataset)
+    coco_data.correct(correct_image=False)
+
+    # when
+    coco_data.images = [images[0]]
+    coco_data.correct(correct_image=False)
+
+    # then
+    assert coco_data.annotations == [annotations[0]]
+
+
+def test_correct__repeated_after_edit_in_place():
+    # given
+    coco_data = CocoData(dataset)
+    coco_data.correct(correct_image=False)
+
+    # when
+    coco_data.categories[0] = {"id": 999, "name": "other", "supercategory": "other"}
+    coco_data.images[1] = {"id": 999, "file_name": "other.jpg", "width": 1, "height": 1}
+    coco_data.correct()
+
+    # then
+    assert coco_data.annotations == [annotations[2]]
+    assert coco_data.images == [images[2]]
+
+
+def test_data_is_freed_without_gc():
+    # given
+    class Annotations(list):
+        pass
+
+    coco_data = CocoData(dataset)
+    coco_data.correct()
+    coco_data.annotations = Annotations(coco_data.annotations)
+    ref = weakref.ref(coco_data.annotations)
+
+    # when
+    gc.disable()
+    try:
+        del coco_data
+
+        # then
+        assert ref() is None
+    finally:
+        gc.enable()
+
+
 def test_get_dataset():
     coco_data = CocoData(dataset)
     assert coco_data.get_dataset() == dataset
 
 
+def test_init_does_not_modify_given_dict():
+    # when
+    coco_data = CocoData(dataset)
+    coco_data.add_filter(ImageFileNameFilter(FilterType.INCLUSION, ["image0.jpg"]))
+    coco_data.apply_filter().correct()
+
+    # then
+    assert coco_data.images == [images[0]]
+    assert dataset["images"] == images
+    assert len(dataset["images"]) == 3
+    assert len(dataset["annotations"]) == 3
+
+    # when
+    coco_data = CocoData(dataset, deep=True)
+
+    # then
+    assert coco_data.get_dataset() == dataset
+    assert coco_data.images[0] is not images[0]
+
+
+def test_init__null_licenses_and_info(tmp_path):
+    # given
+    given = {**dataset, "licenses": None, "info": None}
+    file_path = str(tmp_path / "annotation.json")
+    with open(file_path, "w") as f:
+        json.dump(given, f)
+
+    # when
+    from_dict = CocoData(given)
+    from_file = CocoData(file_path)
+
+    # then
+    assert from_dict.get_dataset() == given
+    assert from_file.get_dataset() == given
+
+
+def test_init_validate():
+    # given
+    invalid = {**dataset, "images": [{"id": 1, "file_name": "image0.jpg"}]}
+
+    # then
+    with pytest.raises(KeyError):
+        CocoData(invalid)
+
+    # when
+    coco_data = CocoData(invalid, validate=False)
+
+    # then
+    assert coco_data.images == invalid["images"]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(data_module, "orjson", None)
+    return request.param
+
+
+def test_save_and_load(tmp_path, json_backend):
+    # given
+    file_path = str(tmp_path / "annotation.json")
+
+    # when
+    CocoData(dataset).save(file_path, correct_image=False)
+    coco_data = CocoData(file_path)
+
+    # then
+    assert coco_data.get_dataset() == dataset
+
+
+def test_save__non_str_keys(tmp_path, json_backend):
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    coco_data = CocoData({**dataset, "info": {1: "one"}})
+
+    # when
+    coco_data.save(file_path, correct_image=False)
+
+    # then
+    assert CocoData(file_path).info == {"1": "one"}
+
+
+def test_save__nan_and_large_int(tmp_path, json_backend):
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    given = {
+        **dataset,
+        "annotations": [{**annotations[0], "area": float("nan"), "id": 2**70}],
+    }
+
+    # when
+    CocoData(given).save(file_path, correct_image=False)
+
+    # then
+    with open(file_path) as f:
+        text = f.read()
+    assert "NaN" in text
+    assert "null" not in text
+    coco_data = CocoData(file_path)
+    assert math.isnan(coco_data.annotations[0]["area"])
+    assert coco_data.annotations[0]["id"] == 2**70
+
+
+def test_save__none(tmp_path, json_backend):
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    given = {**dataset, "info": {"url": None}}
+
+    # when
+    CocoData(given).save(file_path, correct_image=False)
+
+    # then
+    assert CocoData(file_path).get_dataset() == given
+
+
+def test_dump_json_and_load_json(tmp_path, json_backend):
+    # given
+    file_path = str(tmp_path / "annotation.json")
+
+    # when
+    dump_json(dataset, file_path)
+
+    # then
+    with open(file_path) as f:
+        assert json.load(f) == dataset
+    assert load_json(file_path) == dataset
+
+
+def test_load_json__empty_file(tmp_path, json_backend):
+    # given
+    file_path = tmp_path / "annotation.json"
+    file_path.touch()
+
+    # then
+    with pytest.raises(json.JSONDecodeError):
+        load_json(str(file_path))
+
+
+def test_load_json__nan_and_infinity(tmp_path, json_backend):
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    with open(file_path, "w") as f:
+        f.write('{"images": [], "area": NaN, "max": Infinity, "min": -Infinity}')
+
+    # when
+    loaded = load_json(file_path)
+
+    # then
+    assert loaded["images"] == []
+    assert math.isnan(loaded["area"])
+    assert loaded["max"] == math.inf
+    assert loaded["min"] == -math.inf
+
+
+def test_from_file_streaming(tmp_path):
+    pytest.importorskip("ijson")
+
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    CocoData(dataset).save(file_path, correct_image=False)
+    include_filter = ImageFileNameFilter(
+        FilterType.INCLUSION, ["image0.jpg", "image1.jpg"]
+    )
+    exclude_filter = CategoryNameFilter(FilterType.EXCLUSION, ["category0"])
+
+    # when
+    coco_data = CocoData.from_file_streaming(
+        file_path, filters=[include_filter, exclude_filter]
+    )
+
+    # then
+    assert coco_data.filter_applied
+    assert coco_data.info == info
+    assert coco_data.licenses == licenses
+    assert coco_data.images == [images[0], images[1]]
+    assert coco_data.categories == [categories[1], categories[2]]
+    assert coco_data.annotations == annotations
+
+    # when
+    coco_data.correct()
+
+    # then
+    assert coco_data.annotations == [annotations[1]]
+    assert coco_data.images == [images[1]]
+
+
+def test_from_file_streaming__key_order_and_nested_values(tmp_path):
+    pytest.importorskip("ijson")
+
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    nested = {
+        "annotations": [
+            {**ann, "segmentation": [[0, 0, 1, 1]], "attributes": {"a": [{"b": 1}]}}
+            for ann in annotations
+        ],
+        "categories": categories,
+        "images": images,
+        "licenses": licenses,
+        "info": {**info, "extra": {"nested": [1, 2.5, None]}},
+    }
+    with open(file_path, "w") as f:
+        json.dump(nested, f)
+
+    # when
+    coco_data = CocoData.from_file_streaming(file_path)
+
+    # then
+    assert coco_data.get_dataset() == nested
+
+
+def test_from_file_streaming__null_licenses_and_info(tmp_path):
+    pytest.importorskip("ijson")
+
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    with open(file_path, "w") as f:
+        json.dump({**dataset, "licenses": None, "info": None}, f)
+
+    # when
+    coco_data = CocoData.from_file_streaming(file_path)
+
+    # then
+    assert coco_data.licenses is None
+    assert coco_data.info is None
+    assert coco_data.get_dataset() == CocoData(file_path).get_dataset()
+
+
+def test_from_file_streaming__missing_keys(tmp_path):
+    pytest.importorskip("ijson")
+
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    CocoData(dataset).save(file_path, correct_image=False)
+    with open(file_path) as f:
+        text = f.read()
+    with open(file_path, "w") as f:
+        f.write(text.replace('"file_name"', '"name"', 1))
+
+    # then
+    with pytest.raises(KeyError) as exc_info:
+        CocoData.from_file_streaming(file_path)
+    assert "Missing keys ['file_name'] in image with ID: 1" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("key", ["images", "categories", "annotations"])
+def test_from_file_streaming__missing_list(tmp_path, key):
+    pytest.importorskip("ijson")
+
+    # given
+    file_path = str(tmp_path / "annotation.json")
+    with open(file_path, "w") as f:
+        json.dump({k: v for k, v in dataset.items() if k != key}, f)
+
+    # then
+    with pytest.raises(KeyError):
+        CocoData(file_path)
+    with pytest.raises(KeyError):
+        CocoData.from_file_streaming(file_path)
+
+
 def test_sample():
     # given
     num = 100